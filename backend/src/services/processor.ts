@@ -2,7 +2,8 @@
  * Python script integration service for audio separation
  */
 
-import { spawn } from 'child_process';
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import { randomUUID } from 'crypto';
 import path from 'path';
 import { resolveProjectPath, detectMediaType, getTempAudioPath, cleanupFile, getFileInfo } from '../utils/storage';
 import { ProcessingError } from '../utils/errors';
@@ -29,11 +30,13 @@ export interface ProcessingResult {
   processing?: {
     time_seconds: number;
     model: string;
+    device?: string;
   };
   message?: string;
   error_type?: string;
   warnings?: string[];
   originalFileType?: 'audio' | 'video';
+  id?: string;
 }
 
 /**
@@ -127,88 +130,199 @@ export async function separateAudio(
   }
 }
 
+interface WorkerProcess {
+  process: ChildProcessWithoutNullStreams;
+  stderrTail: () => string;
+}
+
+interface PendingJob {
+  resolve: (result: ProcessingResult) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+// Keep only the tail of the worker's stderr for error details
+const MAX_STDERR_LENGTH = 10000;
+// One Python worker per concurrent queue job, so jobs never wait on each other
+const WORKER_POOL_SIZE = Math.max(1, parseInt(process.env.JOB_CONCURRENCY || '1', 10));
+// A job running longer than this kills its worker; the next job respawns it
+const PYTHON_JOB_TIMEOUT = parseInt(process.env.JOB_TIMEOUT_MS || '900000', 10); // 15 minutes default
+
 /**
- * Process audio file using Python separation script
+ * Long-lived Python worker running `separate.py --server`
+ *
+ * The process is spawned on first use and kept alive, so the Python, torch
+ * and Demucs import cost and model load are paid once instead of per job.
+ * Jobs are written to stdin as JSON lines tagged with a unique id, and each
+ * JSON result line is matched back to its job by that id. If the process
+ * exits or a job exceeds PYTHON_JOB_TIMEOUT, the process is killed, pending
+ * jobs are rejected and a new process is spawned for the next job.
  */
-async function processAudioFile(
-  inputPath: string,
-  outputDir: string,
-  originalFileType: 'audio' | 'video'
-): Promise<ProcessingResult> {
-  return new Promise((resolve, reject) => {
+class PythonWorker {
+  private child: WorkerProcess | null = null;
+  private pending = new Map<string, PendingJob>();
+
+  /** Number of jobs currently sent to this worker */
+  get load(): number {
+    return this.pending.size;
+  }
+
+  run(inputPath: string, outputDir: string): Promise<ProcessingResult> {
+    const child = this.child ?? this.start();
+    const id = randomUUID();
+
+    return new Promise((resolve, reject) => {
+      // A hung inference would otherwise block this worker forever
+      const timer = setTimeout(() => {
+        this.fail(
+          new ProcessingError('Python worker timed out', {
+            timeout_ms: PYTHON_JOB_TIMEOUT,
+            python_stderr: child.stderrTail(),
+          }),
+          child
+        );
+        child.process.kill('SIGKILL');
+      }, PYTHON_JOB_TIMEOUT);
+
+      this.pending.set(id, { resolve, reject, timer });
+      child.process.stdin.write(JSON.stringify({ id, input: inputPath, output: outputDir }) + '\n');
+    });
+  }
+
+  private start(): WorkerProcess {
     // Resolve Python script path relative to project root
     const pythonScript = resolveProjectPath('python-worker/separate.py');
     const pythonExecutable = process.env.PYTHON_PATH || 'python3';
 
-    // Spawn Python process
-    const python = spawn(pythonExecutable, [pythonScript, inputPath, outputDir], {
+    // Spawn Python process in server mode
+    const child = spawn(pythonExecutable, [pythonScript, '--server'], {
       cwd: resolveProjectPath('.'),
     });
+    // Buffers are per child, so late output from a killed child cannot
+    // leak into the respawned one
+    let stdoutBuffer = '';
+    let stderrTail = '';
+    const worker: WorkerProcess = { process: child, stderrTail: () => stderrTail };
+    this.child = worker;
+    child.stdout.setEncoding('utf8');
 
-    let output = '';
-    let errorOutput = '';
+    child.stdout.on('data', (data) => {
+      if (this.child !== worker) {
+        return;
+      }
+      stdoutBuffer += data;
 
-    python.stdout.on('data', (data) => {
-      output += data.toString();
+      let newlineIndex: number;
+      while ((newlineIndex = stdoutBuffer.indexOf('\n')) !== -1) {
+        const line = stdoutBuffer.slice(0, newlineIndex).trim();
+        stdoutBuffer = stdoutBuffer.slice(newlineIndex + 1);
+        if (line) {
+          this.handleLine(line);
+        }
+      }
     });
 
-    python.stderr.on('data', (data) => {
-      errorOutput += data.toString();
+    child.stderr.on('data', (data) => {
+      stderrTail = (stderrTail + data.toString()).slice(-MAX_STDERR_LENGTH);
       // Log Python stderr (may contain warnings or info)
       console.log('Python stderr:', data.toString());
     });
 
-    python.on('close', async (code) => {
-      if (code === 0) {
-        try {
-          // Parse JSON output from Python script
-          const result: ProcessingResult = JSON.parse(output.trim());
-          
-          // Add original file type to result
-          result.originalFileType = originalFileType;
-
-          if (result.status === 'success') {
-            resolve(result);
-          } else {
-            reject(
-              new ProcessingError(
-                result.message || 'Processing failed',
-                {
-                  error_type: result.error_type,
-                  python_output: output,
-                }
-              )
-            );
-          }
-        } catch (parseError) {
-          reject(
-            new ProcessingError('Failed to parse Python script output', {
-              python_output: output,
-              python_stderr: errorOutput,
-              parse_error: parseError instanceof Error ? parseError.message : String(parseError),
-            })
-          );
-        }
-      } else {
-        reject(
-          new ProcessingError('Python script execution failed', {
-            exit_code: code,
-            python_stderr: errorOutput,
-            python_stdout: output,
-          })
-        );
-      }
+    // Write failures surface through the 'close' handler below
+    child.stdin.on('error', (error) => {
+      console.error('Failed to write job to Python worker:', error.message);
     });
 
-    python.on('error', (error) => {
-      reject(
+    child.on('close', (code) => {
+      this.fail(
+        new ProcessingError('Python worker exited unexpectedly', {
+          exit_code: code,
+          python_stderr: stderrTail,
+        }),
+        worker
+      );
+    });
+
+    child.on('error', (error) => {
+      this.fail(
         new ProcessingError('Failed to spawn Python process', {
           error: error.message,
           python_executable: pythonExecutable,
           python_script: pythonScript,
-        })
+        }),
+        worker
       );
     });
-  });
+
+    return worker;
+  }
+
+  private handleLine(line: string): void {
+    let result: ProcessingResult | null = null;
+    try {
+      // Parse JSON result line from Python worker
+      result = JSON.parse(line);
+    } catch {
+      // Not JSON: stray library output, handled below
+    }
+
+    const id = result && typeof result === 'object' ? result.id : undefined;
+    const job = id !== undefined ? this.pending.get(id) : undefined;
+    if (!result || id === undefined || !job) {
+      console.error('Unexpected output from Python worker:', line);
+      return;
+    }
+
+    this.pending.delete(id);
+    clearTimeout(job.timer);
+    delete result.id;
+    job.resolve(result);
+  }
+
+  private fail(error: ProcessingError, child: WorkerProcess): void {
+    if (this.child !== child) {
+      return;
+    }
+    this.child = null;
+
+    const pending = this.pending;
+    this.pending = new Map();
+    for (const job of pending.values()) {
+      clearTimeout(job.timer);
+      job.reject(error);
+    }
+  }
+}
+
+// Workers are spawned lazily, so unused pool slots cost nothing
+const pythonWorkers = Array.from({ length: WORKER_POOL_SIZE }, () => new PythonWorker());
+
+/**
+ * Pick the pool worker with the fewest jobs in flight
+ */
+function pickWorker(): PythonWorker {
+  return pythonWorkers.reduce((least, worker) => (worker.load < least.load ? worker : least));
 }
 
+/**
+ * Process audio file using the long-lived Python separation worker
+ */
+async function processAudioFile(
+  inputPath: string,
+  outputDir: string,
+  originalFileType: 'audio' | 'video'
+): Promise<ProcessingResult> {
+  const result = await pickWorker().run(inputPath, outputDir);
+
+  // Add original file type to result
+  result.originalFileType = originalFileType;
+
+  if (result.status !== 'success') {
+    throw new ProcessingError(result.message || 'Processing failed', {
+      error_type: result.error_type,
+      python_output: JSON.stringify(result),
+    });
+  }
+
+  return result;
+}
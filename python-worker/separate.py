@@ -5,28 +5,62 @@ Uses Demucs AI to separate vocals from background music in audio files.
 """
 
 import sys
+import errno
 import json
 import os
 import time
 import logging
 import shutil
+import stat
 import contextlib
+import multiprocessing
+import queue
+import tempfile
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from io import StringIO
-from demucs.separate import main as separate_main
+
+# Environment defaults read at import time, so they must precede torch/demucs.
+# Disable Demucs' tqdm progress bars unless explicitly configured.
+os.environ.setdefault('TQDM_DISABLE', '1')
+# Limit CUDA allocator fragmentation across variable-length tracks.
+os.environ.setdefault('PYTORCH_CUDA_ALLOC_CONF', 'max_split_size_mb:512,expandable_segments:True')
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON output
+    orjson = None
+
+import lameenc
+import torch
+import torchaudio
+from demucs.apply import BagOfModels, apply_model
+from demucs.audio import AudioFile, convert_audio, prevent_clip
+from demucs.htdemucs import HTDemucs
+from demucs.pretrained import get_model
 
 # Configuration constants
 MAX_FILE_SIZE_MB = 500
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
-SUPPORTED_FORMATS = {
-    # Audio formats
-    '.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac',
-    # Video formats (audio will be extracted before processing)
+SUPPORTED_FORMATS = frozenset({
+    '.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac'
+})
+# Video formats are rejected: the backend extracts their audio before calling this script
+VIDEO_FORMATS = frozenset({
     '.mp4', '.mpeg', '.mpg', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv'
-}
-DEMUCS_MODEL = 'htdemucs'
+})
+_SUPPORTED_FORMATS_STR = ', '.join(sorted(SUPPORTED_FORMATS))
+# hdemucs_mmi is ~3x faster than htdemucs; mdx_extra_q trades quality for more speed
+DEMUCS_MODEL = os.environ.get('NEUSIK_DEMUCS_MODEL', 'hdemucs_mmi')
 OUTPUT_BITRATE = '256'
+MP3_QUALITY = 2  # LAME quality: 2 is highest, 7 is fastest
+MP3_CHUNK_SAMPLES = 44100 * 10  # PCM samples fed to the encoder per call
+# Smallest segment (seconds) the out-of-memory fallback will shrink to
+MIN_SEGMENT_SECONDS = 2
+LOW_DISK_SPACE_BYTES = 100 * 1024 * 1024
+DISK_USAGE_TTL_SECONDS = 60
 
 # Setup logging
 logging.basicConfig(
@@ -36,6 +70,84 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _parse_shifts(value: Optional[str]) -> int:
+    """
+    Parse NEUSIK_SHIFTS, falling back to 0 on invalid values.
+    
+    A bad value must not crash the worker at import time, before it can
+    report a JSON error to the backend.
+    
+    Returns:
+        int: Non-negative number of random-shift passes
+    """
+    if value is None:
+        return 0
+    try:
+        shifts = int(value)
+    except ValueError:
+        logger.warning('Invalid NEUSIK_SHIFTS %r, using 0', value)
+        return 0
+    if shifts < 0:
+        logger.warning('Negative NEUSIK_SHIFTS %d, using 0', shifts)
+        return 0
+    return shifts
+
+
+# Random-shift passes per track; each shift is another full forward pass.
+# 0 favours throughput, raise it to trade latency for separation quality.
+DEMUCS_SHIFTS = _parse_shifts(os.environ.get('NEUSIK_SHIFTS'))
+
+
+def _pick_device() -> str:
+    """
+    Select the fastest available torch device for inference.
+    
+    Returns:
+        'cuda', 'mps' or 'cpu'
+    """
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+
+def _pick_autocast_dtype() -> Optional[torch.dtype]:
+    """
+    Select a reduced-precision dtype for inference on Tensor Core GPUs.
+    
+    Returns:
+        torch.bfloat16 on Ampere or newer, torch.float16 on Volta/Turing,
+        or None to run in full precision
+    """
+    if _DEVICE != 'cuda':
+        return None
+    major, _ = torch.cuda.get_device_capability(0)
+    if major >= 8:
+        return torch.bfloat16
+    if major >= 7:
+        return torch.float16
+    return None
+
+
+# Let cuDNN benchmark conv algorithms per input shape and allow TF32
+# Tensor Core math on Ampere or newer GPUs
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+
+_DEVICE = _pick_device()
+_AUTOCAST_DTYPE = _pick_autocast_dtype()
+logger.info('Using device for Demucs inference: %s (autocast: %s)', _DEVICE, _AUTOCAST_DTYPE)
+
+# Free disk space per outputs root: parent dir -> (monotonic timestamp, free bytes)
+_disk_usage_cache: Dict[str, Tuple[float, int]] = {}
+
+# Demucs model cache, loaded once per process and reused across calls
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
 class SeparationError(Exception):
     """Base exception for audio separation errors."""
     pass
@@ -76,7 +188,21 @@ def get_file_format(file_path: Path) -> Optional[str]:
     Returns:
         Format string (e.g., 'mp3') or None if unknown
     """
-    ext = file_path.suffix.lower()
+    return _format_from_suffix(file_path.suffix)
+
+
+@lru_cache(maxsize=32)
+def _format_from_suffix(suffix: str) -> Optional[str]:
+    """
+    Map a file suffix (e.g. '.MP3') to its format string, cached per suffix.
+    
+    Args:
+        suffix: File extension including the leading dot
+        
+    Returns:
+        Format string (e.g., 'mp3') or None if unknown
+    """
+    ext = suffix.lower()
     if ext in SUPPORTED_FORMATS:
         return ext.lstrip('.')
     return None
@@ -86,8 +212,8 @@ def is_video_file(file_path: Path) -> bool:
     """
     Check if file is a video file based on extension.
     
-    Note: Video files should have audio extracted before reaching this script.
-    This function is mainly for validation purposes.
+    Note: Video files must have audio extracted before reaching this script;
+    validate_input_file rejects them.
     
     Args:
         file_path: Path to the file
@@ -95,8 +221,7 @@ def is_video_file(file_path: Path) -> bool:
     Returns:
         True if file appears to be a video file
     """
-    video_extensions = {'.mp4', '.mpeg', '.mpg', '.mov', '.avi', '.webm', '.mkv', '.flv', '.wmv'}
-    return file_path.suffix.lower() in video_extensions
+    return file_path.suffix.lower() in VIDEO_FORMATS
 
 
 def validate_input_file(input_path: str) -> Tuple[Path, Dict]:
@@ -111,41 +236,52 @@ def validate_input_file(input_path: str) -> Tuple[Path, Dict]:
         
     Raises:
         FileNotFoundError: If file doesn't exist
-        InvalidFormatError: If format is not supported
         FileSizeError: If file is too large
+        InvalidFormatError: If format is not supported or file is a video
         PermissionError: If file is not readable
     """
     input_file = Path(input_path)
     
-    # Check if file exists
-    if not input_file.exists():
-        raise FileNotFoundError(f'Input file not found: {input_path}')
+    # Single stat call for existence, file type and size
+    try:
+        file_stat = os.stat(input_file)
+    except OSError as e:
+        if e.errno in (errno.ENOENT, errno.ENOTDIR):
+            raise FileNotFoundError(f'Input file not found: {input_path}')
+        if e.errno == errno.EACCES:
+            raise PermissionError(f'Cannot read file (permission denied): {input_path}')
+        raise
     
     # Check if it's a file (not directory)
-    if not input_file.is_file():
+    if not stat.S_ISREG(file_stat.st_mode):
         raise ValueError(f'Path is not a file: {input_path}')
     
-    # Check read permissions
-    if not os.access(input_file, os.R_OK):
-        raise PermissionError(f'Cannot read file (permission denied): {input_path}')
+    # Check file size first so oversized uploads fail fast
+    file_size = file_stat.st_size
+    if file_size > MAX_FILE_SIZE_BYTES:
+        size_mb = file_size / (1024 * 1024)
+        max_mb = MAX_FILE_SIZE_MB
+        raise FileSizeError(
+            f'File too large: {size_mb:.2f}MB. Maximum size: {max_mb}MB'
+        )
     
     # Check file format
+    if is_video_file(input_file):
+        raise InvalidFormatError(
+            f'Video file received: {input_file.name}. '
+            f'Extract the audio track before separation. '
+            f'Supported formats: {_SUPPORTED_FORMATS_STR}'
+        )
     file_format = get_file_format(input_file)
     if not file_format:
-        supported = ', '.join(sorted(SUPPORTED_FORMATS))
         raise InvalidFormatError(
             f'Unsupported file format: {input_file.suffix}. '
-            f'Supported formats: {supported}'
+            f'Supported formats: {_SUPPORTED_FORMATS_STR}'
         )
     
-    # Check file size
-    file_size = input_file.stat().st_size
-    if file_size > MAX_FILE_SIZE_BYTES:
-        size_mb = file_size / (1024 * 1024)
-        max_mb = MAX_FILE_SIZE_MB
-        raise FileSizeError(
-            f'File too large: {size_mb:.2f}MB. Maximum size: {max_mb}MB'
-        )
+    # Check read permissions
+    if not os.access(input_file, os.R_OK):
+        raise PermissionError(f'Cannot read file (permission denied): {input_path}')
     
     # Get file info
     file_info = {
@@ -155,11 +291,44 @@ def validate_input_file(input_path: str) -> Tuple[Path, Dict]:
         'format': file_format
     }
     
-    logger.info(f'Validated input file: {input_file.name} ({file_size / (1024*1024):.2f}MB, {file_format})')
+    if logger.isEnabledFor(logging.INFO):
+        logger.info('Validated input file: %s (%.2fMB, %s)',
+                    input_file.name, file_size / (1024 * 1024), file_format)
     
     return input_file, file_info
 
 
+def _get_free_disk_space(path: Path) -> int:
+    """
+    Return free disk space for a directory, cached for DISK_USAGE_TTL_SECONDS.
+    
+    Free space barely changes between requests, so this avoids a statvfs
+    call per processed file. Entries are keyed by the parent directory
+    without a syscall, so per-job output directories under one outputs root
+    share a single entry.
+    
+    Args:
+        path: Directory to check
+        
+    Returns:
+        Free space in bytes
+    """
+    key = str(path.parent)
+    now = time.monotonic()
+    cached = _disk_usage_cache.get(key)
+    if cached is not None and now - cached[0] < DISK_USAGE_TTL_SECONDS:
+        return cached[1]
+    
+    # Drop expired entries so unmounted filesystems do not linger
+    for cached_key, (timestamp, _) in list(_disk_usage_cache.items()):
+        if now - timestamp >= DISK_USAGE_TTL_SECONDS:
+            del _disk_usage_cache[cached_key]
+    
+    free_space = shutil.disk_usage(path).free
+    _disk_usage_cache[key] = (now, free_space)
+    return free_space
+
+
 def validate_output_dir(output_dir: str) -> Path:
     """
     Validate and create output directory if needed.
@@ -175,27 +344,247 @@ def validate_output_dir(output_dir: str) -> Path:
     """
     output_path = Path(output_dir)
     
-    # Try to create directory if it doesn't exist
+    # Create the directory if needed; an existing one is the common case
     try:
-        output_path.mkdir(parents=True, exist_ok=True)
+        os.makedirs(output_path)
+    except FileExistsError:
+        pass
     except OSError as e:
         raise PermissionError(f'Cannot create output directory: {output_dir}. Error: {e}')
     
-    # Check write permissions
-    if not os.access(output_path, os.W_OK):
+    # Check write permissions by creating a throwaway file
+    try:
+        with tempfile.TemporaryFile(dir=output_path):
+            pass
+    except OSError:
         raise PermissionError(f'Cannot write to output directory (permission denied): {output_dir}')
     
     # Check available disk space (rough estimate)
-    stat = shutil.disk_usage(output_path)
-    free_space = stat.free
-    if free_space < 100 * 1024 * 1024:  # Less than 100MB free
-        logger.warning(f'Low disk space: {free_space / (1024*1024):.2f}MB available')
+    free_space = _get_free_disk_space(output_path)
+    if free_space < LOW_DISK_SPACE_BYTES:
+        logger.warning('Low disk space: %.2fMB available', free_space / (1024 * 1024))
     
-    logger.info(f'Validated output directory: {output_dir}')
+    logger.info('Validated output directory: %s', output_dir)
     
     return output_path
 
 
+def _get_model():
+    """
+    Load the Demucs model on first use and return the cached instance.
+    
+    The model is moved to the inference device once, so apply_model's
+    per-call sub-model device round-trip for bags of models is a no-op.
+    
+    Returns:
+        Pretrained Demucs model (or bag of models) in eval mode on _DEVICE
+    """
+    global _MODEL
+    if _MODEL is None:
+        logger.info('Loading Demucs model: %s', DEMUCS_MODEL)
+        model = get_model(DEMUCS_MODEL)
+        model.to(_DEVICE)
+        model.eval()
+        _MODEL = model
+    return _MODEL
+
+
+def _max_allowed_segment(model) -> float:
+    """
+    Return the longest segment the model can run on, in seconds.
+    
+    Transformer models pad every chunk to the segment they were trained on,
+    so they cannot go above it; other models have no limit.
+    """
+    if isinstance(model, BagOfModels):
+        return model.max_allowed_segment
+    if isinstance(model, HTDemucs):
+        return float(model.segment)
+    return float('inf')
+
+
+def _pick_segment(model) -> float:
+    """
+    Pick the Demucs segment length to run inference with.
+    
+    Uses the model's own default segment (44s for hdemucs_mmi, 7.8s for
+    htdemucs), which is already as long as the shipped models allow, capped
+    at the model's maximum. _apply_model shrinks it on CUDA out-of-memory.
+    
+    Args:
+        model: Loaded Demucs model or bag of models
+        
+    Returns:
+        Segment length in seconds
+    """
+    if isinstance(model, BagOfModels):
+        segment = float(model.models[0].segment)
+    else:
+        segment = float(model.segment)
+    return min(segment, _max_allowed_segment(model))
+
+
+def _load_track(input_file: Path, audio_channels: int, samplerate: int) -> torch.Tensor:
+    """
+    Decode an audio file into a tensor matching the model's channels and samplerate.
+    
+    Args:
+        input_file: Path to input audio file
+        audio_channels: Number of channels expected by the model
+        samplerate: Samplerate expected by the model
+        
+    Returns:
+        Tensor of shape [channels, samples]
+        
+    Raises:
+        ProcessingError: If the file cannot be decoded
+    """
+    try:
+        return AudioFile(input_file).read(
+            streams=0,
+            samplerate=samplerate,
+            channels=audio_channels
+        )
+    except Exception as e:
+        logger.warning('FFmpeg could not read %s, falling back to torchaudio: %s', input_file.name, e)
+    
+    try:
+        wav, sr = torchaudio.load(str(input_file))
+    except Exception as e:
+        raise ProcessingError(f'Could not decode audio file: {input_file.name}. Error: {e}')
+    return convert_audio(wav, sr, samplerate, audio_channels)
+
+
+def _encode_mp3(wav: torch.Tensor, path: Path, samplerate: int) -> None:
+    """
+    Encode a separated stem straight from memory to an MP3 file.
+    
+    PCM is streamed to the encoder in chunks and written as it is produced,
+    so no intermediate WAV file or full-length interleaved copy is needed.
+    
+    Args:
+        wav: Float tensor of shape [channels, samples]
+        path: Destination MP3 path
+        samplerate: Samplerate of the audio
+    """
+    channels, length = wav.shape
+    pcm = (prevent_clip(wav, mode='rescale').clamp(-1, 1) * (2 ** 15 - 1)).short().cpu()
+    
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(int(OUTPUT_BITRATE))
+    encoder.set_in_sample_rate(samplerate)
+    encoder.set_channels(channels)
+    encoder.set_quality(MP3_QUALITY)
+    encoder.silence()
+    
+    with open(path, 'wb') as f:
+        for offset in range(0, length, MP3_CHUNK_SAMPLES):
+            chunk = pcm[:, offset:offset + MP3_CHUNK_SAMPLES]
+            f.write(encoder.encode(chunk.t().contiguous().numpy().tobytes()))
+        f.write(encoder.flush())
+
+
+def _apply_model(model, mix: torch.Tensor) -> torch.Tensor:
+    """
+    Run the model on a normalized mixture with the tuned inference settings.
+    
+    Applies the device, shift, segment and mixed-precision settings, and
+    retries with a smaller segment on CUDA out-of-memory. Transformer models
+    are not retried: they pad each chunk back to their trained length, so a
+    smaller segment uses the same memory.
+    
+    Args:
+        model: Loaded Demucs model or bag of models
+        mix: Tensor of shape [batch, channels, samples]
+        
+    Returns:
+        Tensor of shape [batch, sources, channels, samples]
+    """
+    segment = _pick_segment(model)
+    can_shrink = _max_allowed_segment(model) == float('inf')
+    while True:
+        # Autocast runs convolutions/LSTMs in reduced precision while
+        # the spectrogram math stays in float32
+        if _AUTOCAST_DTYPE is None:
+            precision = contextlib.nullcontext()
+        else:
+            precision = torch.autocast(device_type='cuda', dtype=_AUTOCAST_DTYPE)
+        try:
+            # Keep anything Demucs prints off stdout, which carries the JSON result
+            with precision, contextlib.redirect_stdout(sys.stderr):
+                return apply_model(model, mix, device=_DEVICE, shifts=DEMUCS_SHIFTS,
+                                   progress=True, segment=segment)
+        except torch.cuda.OutOfMemoryError:
+            # Retry with a smaller segment until it fits in GPU memory
+            if not can_shrink or segment / 2 < MIN_SEGMENT_SECONDS:
+                raise
+            segment /= 2
+            torch.cuda.empty_cache()
+            logger.warning('CUDA out of memory, retrying with segment of %.1fs', segment)
+
+
+@torch.inference_mode()
+def _separate_vocals(input_file: Path, output_path: Path) -> Path:
+    """
+    Run Demucs on a single file with the cached model and save the vocals stem.
+    
+    Runs under inference mode so no autograd state is recorded.
+    
+    Args:
+        input_file: Path to input audio file
+        output_path: Directory where output will be saved
+        
+    Returns:
+        Path to the separated vocals file
+    """
+    with _MODEL_LOCK:
+        model = _get_model()
+        
+        wav = _load_track(input_file, model.audio_channels, model.samplerate)
+        
+        # Normalize input the same way the Demucs CLI does
+        ref = wav.mean(0)
+        wav -= ref.mean()
+        wav /= ref.std()
+        sources = _apply_model(model, wav[None])[0]
+    
+    # Only the vocals stem is denormalized and encoded; the accompaniment
+    # is not needed downstream
+    vocals = sources[model.sources.index('vocals')] * ref.std() + ref.mean()
+    
+    # Demucs layout: output_dir/<model>/<track>/vocals.mp3
+    track_dir = output_path / DEMUCS_MODEL / input_file.stem
+    track_dir.mkdir(parents=True, exist_ok=True)
+    
+    vocals_path = track_dir / 'vocals.mp3'
+    _encode_mp3(vocals, vocals_path, model.samplerate)
+    
+    return vocals_path
+
+
+@torch.inference_mode()
+def warmup() -> None:
+    """
+    Load the Demucs model and run one dummy inference on a full segment.
+    
+    Call at worker startup so the first real request does not pay for model
+    loading, moving weights to the device and cuDNN algorithm selection. The
+    dummy spans one segment so cuDNN tunes for the chunk shape real tracks
+    use. Failures are logged only; process_audio reports them per request.
+    """
+    start_time = time.time()
+    try:
+        with _MODEL_LOCK:
+            model = _get_model()
+            dummy = torch.zeros(1, model.audio_channels,
+                                int(_pick_segment(model) * model.samplerate))
+            _apply_model(model, dummy)
+    except Exception as e:
+        logger.warning('Model warmup failed: %s', e)
+        return
+    logger.info('Model warmup completed in %.2fs', time.time() - start_time)
+
+
 def process_audio(input_path: str, output_dir: str) -> Dict:
     """
     Process audio file to separate vocals from background music.
@@ -217,34 +606,17 @@ def process_audio(input_path: str, output_dir: str) -> Dict:
         # Validate output directory
         output_path = validate_output_dir(output_dir)
         
-        logger.info(f'Starting audio separation for: {input_info["name"]}')
+        logger.info('Starting audio separation for: %s', input_info['name'])
         
-        # Run Demucs separation
-        # --two-stems vocals: Extract only vocals
-        # --mp3: Output as MP3 format
-        # --mp3-bitrate 256: Set bitrate to 256 kbps
-        # Redirect stdout to stderr to prevent mixing with JSON output
+        # Run Demucs separation with the cached model
+        # Extracts vocals (two-stem mode) and saves as 256 kbps MP3
         try:
-            # Capture stdout and redirect to stderr so JSON output stays clean
-            original_stdout = sys.stdout
-            sys.stdout = sys.stderr
-            try:
-                separate_main([
-                    str(input_file),
-                    '-o', str(output_path),
-                    '--two-stems', 'vocals',
-                    '--mp3',
-                    '--mp3-bitrate', OUTPUT_BITRATE
-                ])
-            finally:
-                sys.stdout = original_stdout
+            vocals_path = _separate_vocals(input_file, output_path)
+        except ProcessingError:
+            raise
         except Exception as e:
             raise ProcessingError(f'Demucs processing failed: {str(e)}')
         
-        # Find output file
-        # Demucs creates: output_dir/htdemucs/[filename]/vocals.mp3
-        vocals_path = output_path / DEMUCS_MODEL / input_file.stem / 'vocals.mp3'
-        
         if not vocals_path.exists():
             raise ProcessingError('Output file not found after processing. Processing may have failed.')
         
@@ -260,10 +632,11 @@ def process_audio(input_path: str, output_dir: str) -> Dict:
         
         processing_info = {
             'time_seconds': round(processing_time, 2),
-            'model': DEMUCS_MODEL
+            'model': DEMUCS_MODEL,
+            'device': _DEVICE
         }
         
-        logger.info(f'Successfully processed: {input_info["name"]} in {processing_time:.2f}s')
+        logger.info('Successfully processed: %s in %.2fs', input_info['name'], processing_time)
         
         return {
             'status': 'success',
@@ -275,7 +648,7 @@ def process_audio(input_path: str, output_dir: str) -> Dict:
         
     except SeparationError as e:
         processing_time = time.time() - start_time
-        logger.error(f'Processing failed: {str(e)}')
+        logger.error('Processing failed: %s', e)
         return {
             'status': 'error',
             'message': str(e),
@@ -286,7 +659,7 @@ def process_audio(input_path: str, output_dir: str) -> Dict:
         }
     except Exception as e:
         processing_time = time.time() - start_time
-        logger.error(f'Unexpected error: {str(e)}', exc_info=True)
+        logger.error('Unexpected error: %s', e, exc_info=True)
         return {
             'status': 'error',
             'message': f'Unexpected error: {str(e)}',
@@ -297,21 +670,272 @@ def process_audio(input_path: str, output_dir: str) -> Dict:
         }
 
 
+def process_audio_batch(input_paths: List[str], output_dir: str) -> Dict:
+    """
+    Process several audio files with a single loaded Demucs model.
+    
+    Files are separated one after another so model loading and GPU warm-up
+    are paid once for the whole batch. A failing file does not stop the
+    remaining files from being processed.
+    
+    Args:
+        input_paths: Paths to input audio files
+        output_dir: Directory where outputs will be saved
+    
+    Returns:
+        dict: Batch status, per-file results (same format as process_audio)
+              and total processing time
+    """
+    start_time = time.time()
+    
+    results = [process_audio(input_path, output_dir) for input_path in input_paths]
+    failed = sum(1 for result in results if result['status'] != 'success')
+    
+    processing_time = time.time() - start_time
+    logger.info('Processed batch of %d files (%d failed) in %.2fs', len(results), failed, processing_time)
+    
+    return {
+        'status': 'success' if failed == 0 else 'error',
+        'results': results,
+        'processing': {
+            'time_seconds': round(processing_time, 2),
+            'model': DEMUCS_MODEL,
+            'device': _DEVICE
+        }
+    }
+
+
+def _dumps(result: Dict, indent: bool = True) -> str:
+    """
+    Serialize a result as JSON, using orjson when it is installed.
+    
+    Args:
+        result: Result dict from process_audio or a batch function
+        indent: Pretty-print with 2-space indentation; False gives a single line
+        
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    return json.dumps(result, indent=2 if indent else None)
+
+
+def serve(input_stream=None, output_stream=None) -> None:
+    """
+    Run as a long-lived worker reading newline-delimited JSON jobs.
+    
+    Each input line is a job of the form {"input": ..., "output": ...} with an
+    optional "id". One single-line JSON result (process_audio format, with the
+    job "id" echoed back so callers can match results to jobs) is written per
+    job. The model is warmed up once, so each job only pays for inference.
+    
+    Args:
+        input_stream: Stream to read jobs from (default: stdin)
+        output_stream: Stream to write results to (default: stdout)
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    
+    # Anything else printed while serving goes to stderr; results are only
+    # written to the saved output stream
+    with contextlib.redirect_stdout(sys.stderr):
+        warmup()
+        logger.info('Worker ready, waiting for jobs')
+        
+        for line in input_stream:
+            if not line.strip():
+                continue
+            
+            job = None
+            try:
+                job = json.loads(line)
+                result = process_audio(job['input'], job['output'])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error('Invalid job: %s', e)
+                result = {
+                    'status': 'error',
+                    'message': f'Invalid job: {e}',
+                    'error_type': type(e).__name__,
+                    'processing': {
+                        'time_seconds': 0
+                    }
+                }
+            
+            if isinstance(job, dict) and 'id' in job:
+                result['id'] = job['id']
+            
+            output_stream.write(_dumps(result, indent=False) + '\n')
+            output_stream.flush()
+
+
+def _pool_worker(task_queue, result_queue, output_dir: str) -> None:
+    """
+    Worker process loop for process_audio_pool.
+    
+    Each worker is started with CUDA_VISIBLE_DEVICES pinned to one GPU, warms
+    up its own model and processes (index, path) tasks until it receives None.
+    """
+    warmup()
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        index, input_path = task
+        result_queue.put((index, process_audio(input_path, output_dir)))
+
+
+def _visible_gpus() -> List[str]:
+    """
+    Return the GPU ids this process may use, as CUDA_VISIBLE_DEVICES entries.
+    
+    Honours an operator-provided CUDA_VISIBLE_DEVICES so pool workers are
+    pinned to GPUs inside that set rather than to physical ids 0..n-1.
+    """
+    visible = os.environ.get('CUDA_VISIBLE_DEVICES')
+    if visible is not None:
+        return [device.strip() for device in visible.split(',') if device.strip()]
+    return [str(index) for index in range(torch.cuda.device_count())]
+
+
+def process_audio_pool(input_paths: List[str], output_dir: str, n_gpus: int) -> Dict:
+    """
+    Process several audio files in parallel, one worker process per GPU.
+    
+    Demucs has no multi-GPU support, so files are sharded across spawned
+    worker processes that each see a single GPU through CUDA_VISIBLE_DEVICES.
+    Falls back to process_audio_batch when only one worker would be used,
+    including when fewer GPUs are visible than requested.
+    
+    Args:
+        input_paths: Paths to input audio files
+        output_dir: Directory where outputs will be saved
+        n_gpus: Number of GPUs (worker processes) to use
+    
+    Returns:
+        dict: Batch status, per-file results in input order (same format as
+              process_audio) and total processing time
+    """
+    devices = _visible_gpus()
+    n_workers = min(n_gpus, len(input_paths), len(devices))
+    if n_workers <= 1:
+        return process_audio_batch(input_paths, output_dir)
+    
+    start_time = time.time()
+    ctx = multiprocessing.get_context('spawn')
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    for task in enumerate(input_paths):
+        task_queue.put(task)
+    for _ in range(n_workers):
+        task_queue.put(None)
+    
+    # Spawned children inherit os.environ at start time, so pin each one to
+    # its GPU before it imports torch
+    workers = []
+    original_visible_devices = os.environ.get('CUDA_VISIBLE_DEVICES')
+    try:
+        for device in devices[:n_workers]:
+            os.environ['CUDA_VISIBLE_DEVICES'] = device
+            worker = ctx.Process(target=_pool_worker, args=(task_queue, result_queue, output_dir))
+            worker.start()
+            workers.append(worker)
+    finally:
+        if original_visible_devices is None:
+            os.environ.pop('CUDA_VISIBLE_DEVICES', None)
+        else:
+            os.environ['CUDA_VISIBLE_DEVICES'] = original_visible_devices
+    
+    results = [None] * len(input_paths)
+    pending = len(input_paths)
+    while pending:
+        try:
+            index, result = result_queue.get(timeout=1)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+        results[index] = result
+        pending -= 1
+    
+    for worker in workers:
+        worker.join()
+    
+    # Files left without a result belonged to a worker that died
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = {
+                'status': 'error',
+                'message': f'Worker process exited before processing: {input_paths[index]}',
+                'error_type': 'ProcessingError',
+                'processing': {
+                    'time_seconds': 0
+                }
+            }
+    
+    failed = sum(1 for result in results if result['status'] != 'success')
+    processing_time = time.time() - start_time
+    logger.info('Processed batch of %d files on %d GPUs (%d failed) in %.2fs',
+                len(results), n_workers, failed, processing_time)
+    
+    return {
+        'status': 'success' if failed == 0 else 'error',
+        'results': results,
+        'processing': {
+            'time_seconds': round(processing_time, 2),
+            'model': DEMUCS_MODEL,
+            'device': _DEVICE,
+            'workers': n_workers
+        }
+    }
+
+
 if __name__ == '__main__':
+    args = sys.argv[1:]
+    
+    # Long-lived worker mode: jobs on stdin, one JSON result per line on stdout
+    if args == ['--server']:
+        serve()
+        sys.exit(0)
+    
+    # Optional --num-gpus N shards multiple files across GPUs
+    num_gpus = 1
+    if '--num-gpus' in args:
+        flag_index = args.index('--num-gpus')
+        try:
+            num_gpus = int(args[flag_index + 1])
+        except (IndexError, ValueError):
+            print('Error: --num-gpus requires an integer value', file=sys.stderr)
+            sys.exit(1)
+        del args[flag_index:flag_index + 2]
+    
     # Check command-line arguments
-    if len(sys.argv) != 3:
-        print('Usage: python separate.py <input_file> <output_dir>', file=sys.stderr)
+    if len(args) < 2:
+        print('Usage: python separate.py [--num-gpus N] <input_file> [<input_file> ...] <output_dir>',
+              file=sys.stderr)
+        print('       python separate.py --server', file=sys.stderr)
         print('Example: python separate.py song.mp3 ./output', file=sys.stderr)
+        print('Example: python separate.py song1.mp3 song2.wav ./output', file=sys.stderr)
+        print('Example: python separate.py --num-gpus 2 song1.mp3 song2.wav ./output', file=sys.stderr)
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_dir = sys.argv[2]
+    input_files = args[:-1]
+    output_dir = args[-1]
     
-    # Process audio
-    result = process_audio(input_file, output_dir)
+    # Process audio (a single file keeps the single-result JSON format).
+    # A one-shot run gains nothing from warmup, which only pays off when the
+    # cost can be taken before a stream of files.
+    if len(input_files) == 1:
+        result = process_audio(input_files[0], output_dir)
+    elif num_gpus > 1:
+        # Each GPU worker loads and warms up its own model
+        result = process_audio_pool(input_files, output_dir, num_gpus)
+    else:
+        warmup()
+        result = process_audio_batch(input_files, output_dir)
     
     # Output result as JSON
-    print(json.dumps(result, indent=2))
+    print(_dumps(result))
     
     # Exit with appropriate code
     sys.exit(0 if result['status'] == 'success' else 1)
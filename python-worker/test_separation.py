@@ -4,29 +4,56 @@ Test suite for Neusik audio separation script.
 """
 
 import unittest
+import errno
+import io
 import json
 import tempfile
+import wave
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 import sys
+import torch
 
 # Add parent directory to path to import separate module
 sys.path.insert(0, str(Path(__file__).parent))
 
 from separate import (
     process_audio,
+    process_audio_batch,
+    process_audio_pool,
+    serve,
+    warmup,
     validate_input_file,
     validate_output_dir,
     get_file_format,
+    _dumps,
+    _encode_mp3,
+    _parse_shifts,
+    _pick_autocast_dtype,
+    _pick_segment,
+    _apply_model,
+    _visible_gpus,
+    _disk_usage_cache,
+    _get_free_disk_space,
     FileNotFoundError,
     InvalidFormatError,
     FileSizeError,
     PermissionError,
     ProcessingError,
+    DISK_USAGE_TTL_SECONDS,
     MAX_FILE_SIZE_BYTES,
     SUPPORTED_FORMATS
 )
+from demucs.apply import BagOfModels
+from demucs.hdemucs import HDemucs
+from demucs.htdemucs import HTDemucs
+
+
+def make_tiny_bag(segment=44):
+    """Build a small randomly initialised HDemucs bag, shaped like hdemucs_mmi."""
+    model = HDemucs(['drums', 'bass', 'other', 'vocals'], channels=4)
+    return BagOfModels([model], segment=segment)
 
 
 class TestFormatDetection(unittest.TestCase):
@@ -96,6 +123,15 @@ class TestInputValidation(unittest.TestCase):
         with self.assertRaises(InvalidFormatError):
             validate_input_file(str(txt_file))
     
+    def test_video_file_rejected(self):
+        """Test that video files are rejected with an extraction hint."""
+        video_file = Path(self.temp_dir) / 'clip.mp4'
+        video_file.write_bytes(b'fake mp4 content')
+        
+        with self.assertRaises(InvalidFormatError) as ctx:
+            validate_input_file(str(video_file))
+        self.assertIn('Extract the audio', str(ctx.exception))
+    
     def test_file_too_large(self):
         """Test that oversized file raises FileSizeError."""
         large_file = Path(self.temp_dir) / 'large.mp3'
@@ -104,6 +140,34 @@ class TestInputValidation(unittest.TestCase):
         
         with self.assertRaises(FileSizeError):
             validate_input_file(str(large_file))
+    
+    def test_directory_rejected(self):
+        """Test that a directory is not accepted as an input file."""
+        audio_dir = Path(self.temp_dir) / 'album.mp3'
+        audio_dir.mkdir()
+        
+        with self.assertRaises(ValueError):
+            validate_input_file(str(audio_dir))
+    
+    def test_file_under_regular_file_not_found(self):
+        """Test that a path through a regular file raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            validate_input_file(str(self.test_file / 'nested.mp3'))
+    
+    def test_stat_permission_denied(self):
+        """Test that an unreadable parent directory raises PermissionError."""
+        denied = OSError(errno.EACCES, 'Permission denied')
+        with patch('separate.os.stat', side_effect=denied):
+            with self.assertRaises(PermissionError):
+                validate_input_file(str(self.test_file))
+    
+    def test_stat_other_errors_propagate(self):
+        """Test that unrelated OS errors are not reported as a missing file."""
+        io_error = OSError(errno.EIO, 'Input/output error')
+        with patch('separate.os.stat', side_effect=io_error):
+            with self.assertRaises(OSError) as ctx:
+                validate_input_file(str(self.test_file))
+        self.assertEqual(ctx.exception.errno, errno.EIO)
 
 
 class TestOutputValidation(unittest.TestCase):
@@ -131,6 +195,55 @@ class TestOutputValidation(unittest.TestCase):
         
         result = validate_output_dir(str(existing_dir))
         self.assertEqual(result, existing_dir)
+    
+    def test_output_path_is_file(self):
+        """Test that an existing file cannot be used as output directory."""
+        output_file = Path(self.temp_dir) / 'output'
+        output_file.write_text('not a directory')
+        
+        with self.assertRaises(PermissionError):
+            validate_output_dir(str(output_file))
+    
+    @patch('separate.shutil.disk_usage')
+    def test_disk_usage_cached(self, mock_disk_usage):
+        """Test that free disk space is not re-read on every call."""
+        mock_disk_usage.return_value.free = 10 * 1024 ** 3
+        
+        with patch.dict('separate._disk_usage_cache', clear=True):
+            validate_output_dir(self.temp_dir)
+            validate_output_dir(self.temp_dir)
+        
+        mock_disk_usage.assert_called_once()
+    
+    @patch('separate.shutil.disk_usage')
+    def test_disk_usage_cached_per_outputs_root(self, mock_disk_usage):
+        """Test that job directories under one root share a cache entry without a stat."""
+        mock_disk_usage.return_value.free = 10 * 1024 ** 3
+        
+        with patch.dict('separate._disk_usage_cache', clear=True):
+            validate_output_dir(str(Path(self.temp_dir) / 'job_0'))
+            
+            with patch('separate.os.stat') as mock_stat:
+                for i in range(1, 3):
+                    _get_free_disk_space(Path(self.temp_dir) / f'job_{i}')
+            
+            mock_stat.assert_not_called()
+            self.assertEqual(len(_disk_usage_cache), 1)
+        
+        mock_disk_usage.assert_called_once()
+    
+    @patch('separate.shutil.disk_usage')
+    def test_disk_usage_expired_entries_evicted(self, mock_disk_usage):
+        """Test that stale cache entries are dropped on refresh."""
+        mock_disk_usage.return_value.free = 10 * 1024 ** 3
+        stale = '/stale/outputs'
+        
+        with patch.dict('separate._disk_usage_cache', {stale: (0.0, 0)}, clear=True), \
+                patch('separate.time.monotonic', return_value=DISK_USAGE_TTL_SECONDS + 1.0):
+            validate_output_dir(self.temp_dir)
+            
+            self.assertNotIn(stale, _disk_usage_cache)
+            self.assertEqual(len(_disk_usage_cache), 1)
 
 
 class TestProcessAudio(unittest.TestCase):
@@ -147,15 +260,16 @@ class TestProcessAudio(unittest.TestCase):
         """Clean up temporary files."""
         shutil.rmtree(self.temp_dir)
     
-    @patch('separate.separate_main')
+    @patch('separate._separate_vocals')
     def test_successful_processing(self, mock_separate):
         """Test successful audio processing."""
         # Mock Demucs to create expected output structure
-        def mock_separate_side_effect(args):
-            output_path = Path(args[args.index('-o') + 1])
+        def mock_separate_side_effect(input_file, output_path):
             vocals_dir = output_path / 'htdemucs' / 'test'
             vocals_dir.mkdir(parents=True)
-            (vocals_dir / 'vocals.mp3').write_bytes(b'fake vocals')
+            vocals_path = vocals_dir / 'vocals.mp3'
+            vocals_path.write_bytes(b'fake vocals')
+            return vocals_path
         
         mock_separate.side_effect = mock_separate_side_effect
         
@@ -186,7 +300,7 @@ class TestProcessAudio(unittest.TestCase):
         self.assertEqual(result['status'], 'error')
         self.assertEqual(result['error_type'], 'InvalidFormatError')
     
-    @patch('separate.separate_main')
+    @patch('separate._separate_vocals')
     def test_processing_error(self, mock_separate):
         """Test error handling when Demucs processing fails."""
         mock_separate.side_effect = Exception('Demucs error')
@@ -196,6 +310,343 @@ class TestProcessAudio(unittest.TestCase):
         self.assertEqual(result['status'], 'error')
         self.assertEqual(result['error_type'], 'ProcessingError')
         self.assertIn('Demucs processing failed', result['message'])
+    
+    @patch('separate.get_model')
+    def test_model_loaded_once(self, mock_get_model):
+        """Test that the Demucs model is cached across calls."""
+        import separate
+        
+        with patch.object(separate, '_MODEL', None):
+            first = separate._get_model()
+            second = separate._get_model()
+        
+        self.assertIs(first, second)
+        mock_get_model.assert_called_once()
+        mock_get_model.return_value.to.assert_called_once_with(separate._DEVICE)
+    
+    @patch('separate.apply_model')
+    @patch('separate._get_model')
+    def test_warmup_runs_dummy_inference(self, mock_get_model, mock_apply):
+        """Test that warmup loads the model and runs one full-segment inference."""
+        mock_get_model.return_value = make_tiny_bag(segment=10)
+        
+        warmup()
+        
+        mock_get_model.assert_called_once()
+        mock_apply.assert_called_once()
+        # The dummy spans a full segment, the chunk shape of real tracks
+        self.assertEqual(tuple(mock_apply.call_args[0][1].shape), (1, 2, 10 * 44100))
+    
+    @patch('separate._get_model')
+    def test_warmup_failure_is_not_raised(self, mock_get_model):
+        """Test that a warmup failure is logged instead of raised."""
+        mock_get_model.side_effect = Exception('download failed')
+        
+        warmup()
+    
+    @patch('separate.apply_model')
+    @patch('separate.get_model')
+    def test_warmup_leaves_model_on_device(self, mock_get_model, mock_apply):
+        """Test that the warmed-up model stays on the inference device."""
+        import separate
+        
+        mock_get_model.return_value = make_tiny_bag()
+        
+        # 'meta' stands in for a GPU: any parameter left on the CPU shows up
+        with patch.object(separate, '_MODEL', None), patch.object(separate, '_DEVICE', 'meta'):
+            warmup()
+            model = separate._MODEL
+        
+        mock_apply.assert_called_once()
+        self.assertEqual(mock_apply.call_args.kwargs['device'], 'meta')
+        for param in model.parameters():
+            self.assertEqual(param.device.type, 'meta')
+    
+    @patch('separate._DEVICE', 'cpu')
+    @patch('separate._get_model')
+    def test_end_to_end_writes_only_vocals(self, mock_get_model):
+        """Test real separation and MP3 encoding on a short generated WAV."""
+        import separate
+        
+        mock_get_model.return_value = make_tiny_bag()
+        
+        # One second of stereo noise as 16-bit PCM
+        wav_file = Path(self.temp_dir) / 'song.wav'
+        samples = (torch.rand(44100, 2) * 2 - 1) * 0.5
+        with wave.open(str(wav_file), 'wb') as handle:
+            handle.setnchannels(2)
+            handle.setsampwidth(2)
+            handle.setframerate(44100)
+            handle.writeframes((samples * 32767).short().numpy().tobytes())
+        
+        # ffmpeg is not guaranteed in CI, so decode the PCM directly
+        def load_wav(input_file, audio_channels, samplerate):
+            with wave.open(str(input_file), 'rb') as handle:
+                frames = handle.readframes(handle.getnframes())
+            pcm = torch.frombuffer(bytearray(frames), dtype=torch.int16)
+            return pcm.view(-1, 2).t().float() / 32768
+        
+        with patch('separate._load_track', side_effect=load_wav):
+            result = process_audio(str(wav_file), str(self.output_dir))
+        
+        self.assertEqual(result['status'], 'success', result.get('message'))
+        track_dir = self.output_dir / separate.DEMUCS_MODEL / 'song'
+        self.assertEqual(sorted(p.name for p in track_dir.iterdir()), ['vocals.mp3'])
+        self.assertGreater((track_dir / 'vocals.mp3').stat().st_size, 0)
+
+
+class TestProcessAudioBatch(unittest.TestCase):
+    """Test batch audio processing."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_files = []
+        for name in ('first.mp3', 'second.wav'):
+            test_file = Path(self.temp_dir) / name
+            test_file.write_bytes(b'fake audio content')
+            self.test_files.append(str(test_file))
+        self.output_dir = Path(self.temp_dir) / 'output'
+    
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+    
+    @staticmethod
+    def mock_separate_side_effect(input_file, output_path):
+        vocals_dir = output_path / 'htdemucs' / input_file.stem
+        vocals_dir.mkdir(parents=True)
+        vocals_path = vocals_dir / 'vocals.mp3'
+        vocals_path.write_bytes(b'fake vocals')
+        return vocals_path
+    
+    @patch('separate._separate_vocals')
+    def test_successful_batch(self, mock_separate):
+        """Test that every file in the batch is processed."""
+        mock_separate.side_effect = self.mock_separate_side_effect
+        
+        result = process_audio_batch(self.test_files, str(self.output_dir))
+        
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(len(result['results']), 2)
+        self.assertEqual(mock_separate.call_count, 2)
+        for file_result in result['results']:
+            self.assertEqual(file_result['status'], 'success')
+    
+    @patch('separate._separate_vocals')
+    def test_batch_continues_after_failure(self, mock_separate):
+        """Test that a missing file does not stop the rest of the batch."""
+        mock_separate.side_effect = self.mock_separate_side_effect
+        
+        paths = ['/nonexistent/file.mp3'] + self.test_files
+        result = process_audio_batch(paths, str(self.output_dir))
+        
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(result['results'][0]['error_type'], 'FileNotFoundError')
+        self.assertEqual(result['results'][1]['status'], 'success')
+        self.assertEqual(result['results'][2]['status'], 'success')
+    
+    @patch('separate.process_audio_batch')
+    def test_pool_with_one_gpu_runs_in_process(self, mock_batch):
+        """Test that a single-GPU pool does not spawn worker processes."""
+        process_audio_pool(self.test_files, str(self.output_dir), 1)
+        
+        mock_batch.assert_called_once_with(self.test_files, str(self.output_dir))
+    
+    @patch('separate.process_audio_batch')
+    def test_pool_clamped_to_visible_gpus(self, mock_batch):
+        """Test that the pool never uses more workers than visible GPUs."""
+        with patch.dict('os.environ', {'CUDA_VISIBLE_DEVICES': '3'}):
+            process_audio_pool(self.test_files, str(self.output_dir), 4)
+        
+        mock_batch.assert_called_once_with(self.test_files, str(self.output_dir))
+    
+    def test_visible_gpus_respects_environment(self):
+        """Test that pool GPUs come from the operator's CUDA_VISIBLE_DEVICES."""
+        with patch.dict('os.environ', {'CUDA_VISIBLE_DEVICES': '2, 5'}):
+            self.assertEqual(_visible_gpus(), ['2', '5'])
+        
+        with patch.dict('os.environ', {'CUDA_VISIBLE_DEVICES': ''}):
+            self.assertEqual(_visible_gpus(), [])
+
+
+class TestMP3Encoding(unittest.TestCase):
+    """Test in-memory MP3 encoding."""
+    
+    def setUp(self):
+        """Create temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_encode_stereo_tensor(self):
+        """Test that a float tensor longer than one chunk is encoded to MP3."""
+        output_file = Path(self.temp_dir) / 'vocals.mp3'
+        wav = torch.rand(2, 44100 * 12) * 2 - 1
+        
+        _encode_mp3(wav, output_file, 44100)
+        
+        data = output_file.read_bytes()
+        self.assertGreater(len(data), 0)
+        # MP3 frames start with an 11-bit sync word
+        self.assertEqual(data[0], 0xFF)
+        self.assertEqual(data[1] & 0xE0, 0xE0)
+
+
+class TestServerMode(unittest.TestCase):
+    """Test the long-lived stdin/stdout worker mode."""
+    
+    def setUp(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.test_file = Path(self.temp_dir) / 'test.mp3'
+        self.test_file.write_bytes(b'fake mp3 content')
+        self.output_dir = Path(self.temp_dir) / 'output'
+    
+    def tearDown(self):
+        """Clean up temporary files."""
+        shutil.rmtree(self.temp_dir)
+    
+    @patch('separate.warmup')
+    @patch('separate._separate_vocals')
+    def test_one_result_line_per_job(self, mock_separate, mock_warmup):
+        """Test that each job line produces one JSON result line in order."""
+        mock_separate.side_effect = TestProcessAudioBatch.mock_separate_side_effect
+        jobs = [
+            {'id': 'job-1', 'input': str(self.test_file), 'output': str(self.output_dir)},
+            {'id': 'job-2', 'input': '/nonexistent/file.mp3', 'output': str(self.output_dir)},
+        ]
+        input_stream = io.StringIO(''.join(json.dumps(job) + '\n' for job in jobs) + '\n')
+        output_stream = io.StringIO()
+        
+        serve(input_stream, output_stream)
+        
+        mock_warmup.assert_called_once()
+        lines = output_stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        first, second = (json.loads(line) for line in lines)
+        self.assertEqual(first['id'], 'job-1')
+        self.assertEqual(first['status'], 'success')
+        self.assertEqual(second['id'], 'job-2')
+        self.assertEqual(second['error_type'], 'FileNotFoundError')
+    
+    @patch('separate.warmup')
+    @patch('separate.process_audio')
+    def test_stray_prints_do_not_reach_output(self, mock_process, mock_warmup):
+        """Test that stdout writes while serving a job go to stderr."""
+        def noisy_process_audio(input_path, output_dir):
+            print('stray library output')
+            return {'status': 'success'}
+        
+        mock_process.side_effect = noisy_process_audio
+        input_stream = io.StringIO('{"id": "job-1", "input": "a.mp3", "output": "out"}\n')
+        output_stream = io.StringIO()
+        
+        with patch('sys.stdout', output_stream):
+            serve(input_stream)
+        
+        lines = output_stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], 'job-1')
+    
+    @patch('separate.warmup')
+    def test_invalid_job_line(self, mock_warmup):
+        """Test that a malformed job returns an error and keeps serving."""
+        input_stream = io.StringIO('not json\n{"input": "a.mp3"}\n')
+        output_stream = io.StringIO()
+        
+        serve(input_stream, output_stream)
+        
+        results = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(result['status'], 'error')
+            self.assertIn('Invalid job', result['message'])
+
+
+class TestSegmentSelection(unittest.TestCase):
+    """Test Demucs segment length selection."""
+    
+    def test_uses_model_default(self):
+        """Test that the model's own segment is used."""
+        self.assertEqual(_pick_segment(make_tiny_bag(segment=44)), 44)
+    
+    def test_transformer_segment_capped(self):
+        """Test that transformer models are capped at their trained segment."""
+        model = MagicMock(spec=HTDemucs)
+        model.segment = 7.8
+        self.assertEqual(_pick_segment(model), 7.8)
+    
+    @patch('separate._DEVICE', 'cpu')
+    @patch('separate.apply_model')
+    def test_oom_retries_with_half_segment(self, mock_apply):
+        """Test that CUDA out-of-memory retries with half the segment."""
+        sources = torch.zeros(1, 4, 2, 100)
+        mock_apply.side_effect = [torch.cuda.OutOfMemoryError('out of memory'), sources]
+        
+        result = _apply_model(make_tiny_bag(segment=44), torch.zeros(1, 2, 100))
+        
+        self.assertIs(result, sources)
+        self.assertEqual(mock_apply.call_count, 2)
+        self.assertEqual(mock_apply.call_args_list[0].kwargs['segment'], 44)
+        self.assertEqual(mock_apply.call_args_list[1].kwargs['segment'], 22)
+    
+    @patch('separate._DEVICE', 'cpu')
+    @patch('separate.apply_model')
+    def test_oom_not_retried_for_transformer(self, mock_apply):
+        """Test that transformer models re-raise out-of-memory immediately."""
+        mock_apply.side_effect = torch.cuda.OutOfMemoryError('out of memory')
+        model = MagicMock(spec=HTDemucs)
+        model.segment = 7.8
+        
+        with self.assertRaises(torch.cuda.OutOfMemoryError):
+            _apply_model(model, torch.zeros(1, 2, 100))
+        
+        mock_apply.assert_called_once()
+
+
+class TestAutocastSelection(unittest.TestCase):
+    """Test mixed-precision dtype selection."""
+    
+    @patch('separate._DEVICE', 'cuda')
+    @patch('separate.torch.cuda.get_device_capability')
+    def test_capability_branches(self, mock_capability):
+        """Test bf16 on Ampere+, fp16 on Volta/Turing, full precision below."""
+        cases = [((9, 0), torch.bfloat16), ((8, 6), torch.bfloat16),
+                 ((7, 5), torch.float16), ((7, 0), torch.float16), ((6, 1), None)]
+        for capability, expected in cases:
+            with self.subTest(capability=capability):
+                mock_capability.return_value = capability
+                self.assertIs(_pick_autocast_dtype(), expected)
+    
+    @patch('separate.torch.cuda.get_device_capability')
+    def test_off_cuda_full_precision(self, mock_capability):
+        """Test that CPU and MPS run in full precision."""
+        for device in ('cpu', 'mps'):
+            with self.subTest(device=device), patch('separate._DEVICE', device):
+                self.assertIsNone(_pick_autocast_dtype())
+        mock_capability.assert_not_called()
+
+
+class TestShiftsConfig(unittest.TestCase):
+    """Test NEUSIK_SHIFTS parsing."""
+    
+    def test_valid_shifts(self):
+        """Test that a valid value is used as-is."""
+        self.assertEqual(_parse_shifts('2'), 2)
+        self.assertEqual(_parse_shifts(None), 0)
+    
+    def test_invalid_shifts_fall_back(self):
+        """Test that a non-integer value falls back to 0 with a warning."""
+        with self.assertLogs('separate', level='WARNING'):
+            self.assertEqual(_parse_shifts('two'), 0)
+    
+    def test_negative_shifts_clamped(self):
+        """Test that a negative value is clamped to 0 with a warning."""
+        with self.assertLogs('separate', level='WARNING'):
+            self.assertEqual(_parse_shifts('-3'), 0)
 
 
 class TestErrorMessages(unittest.TestCase):
@@ -239,14 +690,15 @@ class TestJSONOutput(unittest.TestCase):
         """Clean up temporary files."""
         shutil.rmtree(self.temp_dir)
     
-    @patch('separate.separate_main')
+    @patch('separate._separate_vocals')
     def test_json_output_structure(self, mock_separate):
         """Test that output is valid JSON with expected structure."""
-        def mock_separate_side_effect(args):
-            output_path = Path(args[args.index('-o') + 1])
+        def mock_separate_side_effect(input_file, output_path):
             vocals_dir = output_path / 'htdemucs' / 'test'
             vocals_dir.mkdir(parents=True)
-            (vocals_dir / 'vocals.mp3').write_bytes(b'fake vocals')
+            vocals_path = vocals_dir / 'vocals.mp3'
+            vocals_path.write_bytes(b'fake vocals')
+            return vocals_path
         
         mock_separate.side_effect = mock_separate_side_effect
         
@@ -261,6 +713,17 @@ class TestJSONOutput(unittest.TestCase):
         self.assertIn('output', parsed)
         self.assertIn('processing', parsed)
         self.assertIn('warnings', parsed)
+    
+    def test_dumps_round_trip(self):
+        """Test that CLI serialization produces equivalent JSON."""
+        result = {
+            'status': 'success',
+            'output': {'path': 'output/hdemucs_mmi/test/vocals.mp3', 'size': 10},
+            'processing': {'time_seconds': 1.25},
+            'warnings': []
+        }
+        
+        self.assertEqual(json.loads(_dumps(result)), result)
 
 
 def run_tests():
@@ -273,6 +736,12 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestInputValidation))
     suite.addTests(loader.loadTestsFromTestCase(TestOutputValidation))
     suite.addTests(loader.loadTestsFromTestCase(TestProcessAudio))
+    suite.addTests(loader.loadTestsFromTestCase(TestProcessAudioBatch))
+    suite.addTests(loader.loadTestsFromTestCase(TestMP3Encoding))
+    suite.addTests(loader.loadTestsFromTestCase(TestServerMode))
+    suite.addTests(loader.loadTestsFromTestCase(TestSegmentSelection))
+    suite.addTests(loader.loadTestsFromTestCase(TestAutocastSelection))
+    suite.addTests(loader.loadTestsFromTestCase(TestShiftsConfig))
     suite.addTests(loader.loadTestsFromTestCase(TestErrorMessages))
     suite.addTests(loader.loadTestsFromTestCase(TestJSONOutput))
     